@@ -18,22 +18,20 @@ def get_electric_field(charges, x, y):
                electric field vector.
     """
     Ex, Ey = 0, 0
+    epsilon = 1e-6
     for q, qx, qy in charges:
         # Calculate the distance from the charge to the point
         dx = x - qx
         dy = y - qy
-        r_squared = dx**2 + dy**2
-        
-        # Avoid division by zero at the charge's location
-        if r_squared == 0:
-            continue
-            
-        r = np.sqrt(r_squared)
-        
+
+        # Avoid division by zero at the charge's location by softening the
+        # denominator; dx and dy are zero there, so the contribution vanishes
+        r_squared = dx**2 + dy**2 + epsilon**2
+
         # Calculate the electric field components using Coulomb's Law (k=1 for simplicity)
-        E = q / r_squared
-        Ex += E * (dx / r)
-        Ey += E * (dy / r)
+        inv_r_cubed = 1.0 / (r_squared * np.sqrt(r_squared))
+        Ex += q * dx * inv_r_cubed
+        Ey += q * dy * inv_r_cubed
         
     return Ex, Ey
 
@@ -71,10 +69,12 @@ def plot_electric_field(charges, x_range=(-10, 10), y_range=(-10, 10), grid_dens
     # Use streamplot to show the direction of the field lines
     plt.streamplot(X, Y, Ex, Ey, color='gray', linewidth=1, density=1.5, arrowstyle='->', arrowsize=1.5)
 
-    # Plot the charges
-    for q, qx, qy in charges:
-        color = 'red' if q > 0 else 'blue'
-        plt.plot(qx, qy, 'o', markersize=abs(q)*10, color=color)
+    # Plot the charges in one call, clamping the marker diameter to 6-20 points;
+    # scatter sizes are areas (points^2)
+    charge_array = np.asarray(charges, dtype=float)
+    sizes = np.clip(np.abs(charge_array[:, 0]) * 5.0, 6.0, 20.0)
+    colors = np.where(charge_array[:, 0] > 0, 'red', 'blue')
+    plt.scatter(charge_array[:, 1], charge_array[:, 2], s=sizes**2, c=colors, zorder=2)
 
     # Set plot labels and title
     plt.xlabel('x')
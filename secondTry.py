@@ -1,7 +1,22 @@
 import streamlit as st
 import numpy as np
-import matplotlib.pyplot as plt
-import pandas as pd
+import matplotlib
+# Non-interactive backend; figures are only ever rendered to images for Streamlit
+matplotlib.use('Agg')
+from matplotlib.figure import Figure
+from hashlib import blake2b
+from io import BytesIO
+
+try:
+    import numba
+    from numba import njit, prange
+    # Streamlit runs every session's script on its own worker thread. The OpenMP layer
+    # handles concurrent callers; workqueue aborts on them and TBB hangs at shutdown
+    numba.config.THREADING_LAYER = 'omp'
+    HAS_NUMBA = True
+except ImportError:
+    # Numba is optional; the NumPy implementation below is used without it
+    HAS_NUMBA = False
 
 # --- Page Configuration ---
 st.set_page_config(
@@ -19,52 +34,158 @@ st.write(
 
 # --- Functions for E-Field Calculation and Plotting ---
 
-def get_electric_field(charges, x, y):
+# Number of streamline sets kept per session for redrawing previously seen inputs
+STREAMLINE_CACHE_SIZE = 32
+
+# Largest grid the field is evaluated on; streamplot interpolates between its points
+MAX_FIELD_DENSITY = 30
+
+# Working-set budget for one row tile of the NumPy field computation (~L2 size)
+FIELD_TILE_BYTES = 256 * 1024
+
+def get_electric_field_grid(q, qx, qy, X, Y):
     """
-    Calculates the electric field vector at a point (x, y) due to a list of charges.
+    Calculates the electric field vectors over a whole grid of points due to a set of charges.
+
+    The charge magnitudes and positions are arrays of shape (N, 1, 1), giving every
+    charge its own axis so the field sums broadcast over the grid. X and Y form an
+    open grid of shapes (1, M) and (M, 1).
     """
-    Ex, Ey = 0, 0
-    # Use a small epsilon to prevent division from zero at the charge's exact location
+    dx = X[None, :, :] - qx
+    dy_all = Y[None, :, :] - qy
+    Ex = np.empty((Y.shape[0], X.shape[1]), dtype=dx.dtype)
+    Ey = np.empty_like(Ex)
+
+    # Work through the grid a block of rows at a time, sized so the (N, rows, M)
+    # temporaries stay cache-resident instead of streaming through main memory
+    tile_rows = max(1, FIELD_TILE_BYTES // (q.shape[0] * X.shape[1] * dx.itemsize))
+
+    # Soften the denominator with a small epsilon instead of masking the charge's
+    # exact location; dx and dy are zero there, so its own contribution vanishes
     epsilon = 1e-6
-    for q, qx, qy in charges:
-        dx = x - qx
-        dy = y - qy
-        r_squared = dx**2 + dy**2
-        
-        if r_squared < epsilon**2:
-            continue
-            
-        r = np.sqrt(r_squared)
-        E = q / r_squared
-        Ex += E * (dx / r)
-        Ey += E * (dy / r)
-        
+    for i0 in range(0, Y.shape[0], tile_rows):
+        rows = slice(i0, i0 + tile_rows)
+        dy = dy_all[:, rows]
+        r_squared = dx**2 + dy**2 + epsilon**2
+        inv_r_cubed = 1.0 / (r_squared * np.sqrt(r_squared))
+
+        # einsum fuses the final charge-weighted products with the reduction over
+        # the charge axis, so those products are never stored
+        np.einsum('nij,nij,nij->ij', q, dx, inv_r_cubed, out=Ex[rows])
+        np.einsum('nij,nij,nij->ij', q, dy, inv_r_cubed, out=Ey[rows])
+
     return Ex, Ey
 
-def create_plot(charges, x_range, y_range, grid_density):
+if HAS_NUMBA:
+    # The explicit signature compiles the kernel eagerly when the app starts instead
+    # of on the first plot, and cache=True lets later processes reuse that build
+    @njit(
+        'void(f4[::1], f4[::1], f4[::1], f4[::1], f4[::1], f4[:, ::1], f4[:, ::1], f4[:, ::1])',
+        parallel=True, fastmath=True, cache=True,
+    )
+    def compute_field(qs, qxs, qys, x, y, Ex, Ey, E_magnitude):
+        """
+        Fills Ex, Ey and E_magnitude with the electric field on the grid spanned by x and y.
+
+        The whole sum is evaluated in a single compiled kernel, so no temporary
+        (charges x grid) arrays are allocated. Only the outer loop over grid rows
+        runs in parallel; every row writes to its own slice of the outputs.
+        The constants are float32 so the arithmetic is not promoted to float64.
+        """
+        epsilon_squared = np.float32(1e-6) * np.float32(1e-6)
+        one = np.float32(1.0)
+        for i in prange(y.shape[0]):
+            for j in range(x.shape[0]):
+                ex, ey = np.float32(0.0), np.float32(0.0)
+                for k in range(qs.shape[0]):
+                    dx = x[j] - qxs[k]
+                    dy = y[i] - qys[k]
+                    # Branchless, so the charge loop can be vectorized; with fastmath
+                    # the sqrt and reciprocal lower to a single rsqrt-style sequence
+                    r_squared = dx * dx + dy * dy + epsilon_squared
+                    inv_r_cubed = one / (r_squared * np.sqrt(r_squared))
+                    ex += qs[k] * dx * inv_r_cubed
+                    ey += qs[k] * dy * inv_r_cubed
+                # Store the magnitude in the same sweep rather than in a second pass
+                Ex[i, j] = ex
+                Ey[i, j] = ey
+                E_magnitude[i, j] = np.sqrt(ex * ex + ey * ey)
+
+@st.cache_data
+def compute_field_arrays(charges, x_range, y_range, field_density):
+    """
+    Computes the grid axes and the electric field and its magnitude on them.
+
+    Results are memoized across Streamlit reruns, so `charges` must be hashable
+    (a tuple of (q, x, y) tuples).
+    """
+    # Single precision is plenty at plot resolution and halves the memory traffic
+    x = np.linspace(x_range[0], x_range[1], field_density, dtype=np.float32)
+    y = np.linspace(y_range[0], y_range[1], field_density, dtype=np.float32)
+    # Open grid: broadcasting forms the full grid only where the field is evaluated
+    X, Y = x[None, :], y[:, None]
+
+    # Convert the charges once; each row is a contiguous (N,) array
+    qs, qxs, qys = np.ascontiguousarray(np.asarray(charges, dtype=np.float32).T)
+
+    if HAS_NUMBA:
+        Ex = np.empty((y.size, x.size), dtype=np.float32)
+        Ey = np.empty((y.size, x.size), dtype=np.float32)
+        E_magnitude = np.empty((y.size, x.size), dtype=np.float32)
+        compute_field(qs, qxs, qys, x, y, Ex, Ey, E_magnitude)
+    else:
+        Ex, Ey = get_electric_field_grid(
+            qs.reshape(-1, 1, 1), qxs.reshape(-1, 1, 1), qys.reshape(-1, 1, 1), X, Y
+        )
+        E_magnitude = np.sqrt(Ex**2 + Ey**2)
+
+    return x, y, Ex, Ey, E_magnitude
+
+def create_plot(charges, x_range, y_range, grid_density, field_density=None):
     """
     Generates and returns the matplotlib figure for the electric field.
+
+    The field is evaluated on a `field_density` x `field_density` grid, by default
+    `grid_density` capped at MAX_FIELD_DENSITY, that streamplot interpolates between.
+    How many streamlines are drawn is set separately by streamplot's `density`.
     """
-    fig, ax = plt.subplots(figsize=(10, 10))
-    
-    x = np.linspace(x_range[0], x_range[1], grid_density)
-    y = np.linspace(y_range[0], y_range[1], grid_density)
-    X, Y = np.meshgrid(x, y)
+    if field_density is None:
+        field_density = min(grid_density, MAX_FIELD_DENSITY)
 
-    Ex, Ey = np.zeros(X.shape), np.zeros(Y.shape)
-    for i in range(X.shape[0]):
-        for j in range(Y.shape[1]):
-            Ex[i, j], Ey[i, j] = get_electric_field(charges, X[i, j], Y[i, j])
+    # Reuse one figure per session instead of building a new one on every rerun
+    if 'fig' not in st.session_state:
+        # Built without pyplot, so no figures pile up in its global registry
+        st.session_state.fig = Figure(figsize=(10, 10))
+        st.session_state.ax = st.session_state.fig.subplots()
+    else:
+        st.session_state.ax.clear()
+    fig, ax = st.session_state.fig, st.session_state.ax
 
-    E_magnitude = np.sqrt(Ex**2 + Ey**2)
-    
-    # Use streamplot to show the direction of the field lines
-    ax.streamplot(X, Y, Ex, Ey, color=E_magnitude, cmap='viridis', linewidth=1, density=1.5, arrowstyle='->', arrowsize=1.5)
+    # Streamlines already drawn for the same inputs are re-added instead of re-integrated
+    charges_key = tuple(map(tuple, charges))
+    streamlines_key = (charges_key, x_range, y_range, field_density)
+    streamlines = st.session_state.setdefault('streamlines', {})
+    if streamlines_key in streamlines:
+        lines, arrows = streamlines[streamlines_key]
+        ax.add_collection(lines)
+        for arrow in arrows:
+            ax.add_patch(arrow)
+    else:
+        x, y, Ex, Ey, E_magnitude = compute_field_arrays(charges_key, x_range, y_range, field_density)
+
+        # Use streamplot to show the direction of the field lines
+        stream = ax.streamplot(x, y, Ex, Ey, color=E_magnitude, cmap='viridis', linewidth=1, density=1.5, arrowstyle='->', arrowsize=1.5)
+
+        # The axes were just cleared, so its only patches are the streamplot arrows
+        streamlines[streamlines_key] = (stream.lines, list(ax.patches))
+        if len(streamlines) > STREAMLINE_CACHE_SIZE:
+            del streamlines[next(iter(streamlines))]
 
-    # Plot the charges
-    for q, qx, qy in charges:
-        color = 'red' if q > 0 else 'blue'
-        ax.plot(qx, qy, 'o', markersize=max(6, min(20, abs(q) * 5)), color=color)
+    # Plot the charges as a single collection; scatter sizes are areas (points^2)
+    charge_array = np.asarray(charges)
+    sizes = np.clip(np.abs(charge_array[:, 0]) * 5, 6, 20) ** 2
+    colors = np.where(charge_array[:, 0] > 0, 'red', 'blue')
+    ax.scatter(charge_array[:, 1], charge_array[:, 2], s=sizes, c=colors, zorder=2)
 
     ax.set_xlabel('x')
     ax.set_ylabel('y')
@@ -87,7 +208,8 @@ if 'charges' not in st.session_state:
 
 # Sliders for plot settings
 st.sidebar.subheader("Plot Settings")
-grid_density = st.sidebar.slider("Grid Density", 10, 50, 25)
+grid_density = st.sidebar.slider("Grid Density", 10, MAX_FIELD_DENSITY, 25)
+field_density = min(grid_density, MAX_FIELD_DENSITY)
 plot_range = st.sidebar.slider("Plot Range", 1, 20, 10)
 x_range = (-plot_range, plot_range)
 y_range = (-plot_range, plot_range)
@@ -108,26 +230,30 @@ if st.sidebar.button("Add Charge"):
 if not st.session_state.charges:
     st.warning("No charges to display. Please add a charge using the sidebar.")
 else:
-    # Create and display the plot
-    field_plot = create_plot(st.session_state.charges, x_range, y_range, grid_density)
-    st.pyplot(field_plot)
+    # Only redraw when the inputs changed; otherwise reuse the last rendered image
+    plot_key = blake2b(
+        repr((st.session_state.charges, x_range, y_range, field_density)).encode()
+    ).digest()
+    if st.session_state.get('last_plot_key') != plot_key:
+        field_plot = create_plot(st.session_state.charges, x_range, y_range, grid_density, field_density)
+        buf = BytesIO()
+        # Same resolution st.pyplot rendered at
+        field_plot.savefig(buf, format='png', dpi=200, bbox_inches='tight')
+        st.session_state.last_plot_png = buf.getvalue()
+        st.session_state.last_plot_key = plot_key
+    st.image(st.session_state.last_plot_png)
 
 # Display and manage current charges
 st.sidebar.subheader("Current Charges")
 if not st.session_state.charges:
     st.sidebar.info("No charges added yet.")
 else:
-    charges_to_keep = []
     for i, (q, qx, qy) in enumerate(st.session_state.charges):
         col1, col2 = st.sidebar.columns([4, 1])
-        with col1:
-            st.write(f"q={q}, x={qx}, y={qy}")
-        with col2:
-            if st.button("❌", key=f"remove_{i}"):
-                # Skip adding this charge to the new list (removes it)
-                continue
-        charges_to_keep.append([q, qx, qy])
-    if len(charges_to_keep) != len(st.session_state.charges):
-        st.session_state.charges = charges_to_keep
-        st.rerun()
+        # Plain text skips st.write's type dispatch and markdown rendering
+        col1.text(f"{i}: q={q:+.1f} at ({qx:.1f}, {qy:.1f})")
+        if col2.button("❌", key=f"remove_{i}"):
+            # Remove the charge in place and redraw straight away
+            st.session_state.charges.pop(i)
+            st.rerun()
 